@@ -13,7 +13,27 @@
 # limitations under the License.
 """Module for conversion from tket primitives to QuEST primitives."""
 
+import importlib
+import socket
+from typing import TYPE_CHECKING, Any
+
 # _metadata.py is copied to the folder after installation.
 from ._metadata import __extension_name__, __extension_version__
-from .backends import QuESTBackend
-from .quest_convert import tk_to_quest
+
+if TYPE_CHECKING:
+    from .backends import QuESTBackend, QuESTServer
+    from .quest_convert import tk_to_quest
+
+# Members importing pyquest are loaded on first use, see backends/__init__.py
+_LAZY_IMPORTS = {"QuESTBackend": ".backends", "tk_to_quest": ".quest_convert"}
+
+if hasattr(socket, "AF_UNIX"):
+    from .backends import QuESTClientBackend
+
+    _LAZY_IMPORTS["QuESTServer"] = ".backends"
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,6 +13,28 @@
 # limitations under the License.
 """Backend for utilising the QuEST simulator directly from pytket"""
 
+import importlib
+import socket
 import warnings
+from typing import TYPE_CHECKING, Any
 
-from .quest_backend import QuESTBackend
+if TYPE_CHECKING:
+    from .quest_backend import QuESTBackend
+    from .quest_server import QuESTServer
+
+# Importing pyquest starts up the QuEST environment, so the modules that
+# import it are only loaded on first use. This keeps QuESTClientBackend free
+# of pyquest.
+_LAZY_IMPORTS = {"QuESTBackend": ".quest_backend"}
+
+# The simulation server and its client communicate over Unix sockets
+if hasattr(socket, "AF_UNIX"):
+    from .quest_client import QuESTClientBackend
+
+    _LAZY_IMPORTS["QuESTServer"] = ".quest_server"
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
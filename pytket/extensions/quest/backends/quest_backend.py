@@ -17,67 +17,67 @@
 
 from collections.abc import Sequence
 from logging import warning
-from typing import Optional, Union
-from uuid import uuid4
+from typing import Any, Optional, Union
 
 import numpy as np
+import pyquest
 from pyquest import Register
+from scipy.sparse import csc_matrix
+from sympy import Symbol, sympify
 
-from pytket.backends import (
-    Backend,
-    CircuitNotRunError,
-    CircuitStatus,
-    ResultHandle,
-    StatusEnum,
-)
+from pytket.backends import CircuitNotValidError
 from pytket.backends.backendinfo import BackendInfo
-from pytket.backends.backendresult import BackendResult
-from pytket.backends.resulthandle import _ResultIdTuple
 from pytket.circuit import Circuit, OpType
 from pytket.extensions.quest._metadata import __extension_version__
+from pytket.extensions.quest.backends.quest_base import _QuESTBaseBackend
 from pytket.extensions.quest.quest_convert import (
     _MEASURE_GATES,
     _ONE_QUBIT_GATES,
     _ONE_QUBIT_ROTATIONS,
     _TWO_QUBIT_GATES,
+    _to_quest_gate,
     tk_to_quest,
 )
-from pytket.passes import (
-    BasePass,
-    DecomposeBoxes,
-    FlattenRegisters,
-    FullPeepholeOptimise,
-    SequencePass,
-    SynthesiseTket,
-    auto_rebase_pass,
-)
-from pytket.predicates import (
-    DefaultRegisterPredicate,
-    GateSetPredicate,
-    NoClassicalControlPredicate,
-    NoFastFeedforwardPredicate,
-    NoMidMeasurePredicate,
-    NoSymbolsPredicate,
-    Predicate,
-)
+from pytket.pauli import Pauli
+from pytket.predicates import NoSymbolsPredicate
+from pytket.utils.operators import QubitPauliOperator
 
 _1Q_GATES = set(_ONE_QUBIT_ROTATIONS) | set(_ONE_QUBIT_GATES) | set(_MEASURE_GATES)
 
+# Gates rotating each Pauli eigenbasis onto the computational basis
+_BASIS_ROTATIONS: dict[Pauli, list[tuple[OpType, list[float]]]] = {
+    Pauli.I: [],
+    Pauli.X: [(OpType.H, [])],
+    Pauli.Y: [(OpType.Rz, [-0.5]), (OpType.H, [])],
+    Pauli.Z: [],
+}
+
+# Names of the QuEST precision codes
+_PRECISIONS = {1: "single", 2: "double", 4: "quad"}
+
+# Pauli generators of the rotation gates, Rp(a) = exp(-i * pi * a * P / 2)
+_ROTATION_GENERATORS = {OpType.Rx: OpType.X, OpType.Ry: OpType.Y, OpType.Rz: OpType.Z}
+
+# Inverses of the non-rotation gates, up to a global phase (which cancels out
+# in the adjoint method as it is applied to both registers)
+_GATE_INVERSES: dict[OpType, tuple[OpType, list[float]]] = {
+    OpType.X: (OpType.X, []),
+    OpType.Y: (OpType.Y, []),
+    OpType.Z: (OpType.Z, []),
+    OpType.H: (OpType.H, []),
+    OpType.S: (OpType.Rz, [-0.5]),
+    OpType.T: (OpType.Rz, [-0.25]),
+    OpType.CX: (OpType.CX, []),
+    OpType.CZ: (OpType.CZ, []),
+    OpType.SWAP: (OpType.SWAP, []),
+}
 
-class QuESTBackend(Backend):
+
+class QuESTBackend(_QuESTBaseBackend):
     """
     Backend for running simulations on the QuEST simulator
     """
 
-    _supports_shots = False
-    _supports_counts = False
-    _supports_state = True
-    _supports_unitary = False
-    _supports_density_matrix = True
-    _supports_expectation = False
-    _expectation_allows_nonhermitian = False
-    _supports_contextual_optimisation = False
-    _persistent_handles = False
     _GATE_SET = {
         *_TWO_QUBIT_GATES.keys(),
         *_1Q_GATES,
@@ -87,6 +87,7 @@ class QuESTBackend(Backend):
     def __init__(
         self,
         result_type: str = "state_vector",
+        precision: Optional[str] = None,
     ) -> None:
         """
         Backend for running simulations on the QuEST simulator
@@ -94,127 +95,317 @@ class QuESTBackend(Backend):
         :param result_type: Indicating the type of the simulation result
             to be returned. It can be either "state_vector" or "density_matrix".
             Defaults to "state_vector"
+        :param precision: Floating-point precision of the simulation, which is
+            fixed when QuEST is built: "single" (complex64 results), "double"
+            (complex128 results) or "quad". Requesting a precision other than
+            that of the installed pyQuEST build raises a ValueError.
+            Defaults to the build precision
         """
-        super().__init__()
+        super().__init__(result_type)
+        build_precision = _PRECISIONS[pyquest.env.precision]
+        if precision is not None and precision != build_precision:
+            raise ValueError(
+                f"Unsupported precision {precision}, the installed QuEST build "
+                f"uses {build_precision} precision"
+            )
+        self._precision = build_precision
         self._backend_info = BackendInfo(
             type(self).__name__,
             None,
             __extension_version__,
             None,
             self._GATE_SET,
+            misc={"precision": self._precision},
         )
-        self._result_type = result_type
         self._sim: type[Union[Register]]
         self._sim = Register
-        if result_type == "state_vector":
-            self._density_matrix = False
-            self._supports_density_matrix = False
-        elif result_type == "density_matrix":
-            self._density_matrix = True
-            self._supports_state = False
-            self._supports_density_matrix = True
+
+    def _run_circuits(self, circuits: list[Circuit]) -> list[np.ndarray]:
+        states = []
+        for circuit in circuits:
+            quest_state = self._sim(circuit.n_qubits, self._density_matrix)
+            states.append(self._simulate(circuit, quest_state))
+            del quest_state
+        return states
+
+    def _simulate(self, circuit: Circuit, quest_state: Register) -> np.ndarray:
+        """Apply a circuit to a register in the zero state and read the result."""
+        quest_circ = tk_to_quest(
+            circuit, reverse_index=True, replace_implicit_swaps=True
+        )
+        quest_state.apply_circuit(quest_circ)
+
+        state: np.ndarray
+        if self._result_type == "state_vector":
+            state = quest_state[:]
         else:
-            raise ValueError(f"Unsupported result type {result_type}")
-
-    @property
-    def _result_id_type(self) -> _ResultIdTuple:
-        return (str,)
-
-    @property
-    def backend_info(self) -> Optional["BackendInfo"]:
-        return self._backend_info
-
-    @property
-    def required_predicates(self) -> list[Predicate]:
-        return [
-            NoClassicalControlPredicate(),
-            NoFastFeedforwardPredicate(),
-            NoMidMeasurePredicate(),
-            NoSymbolsPredicate(),
-            GateSetPredicate(self._GATE_SET),
-            DefaultRegisterPredicate(),
-        ]
+            state = quest_state[:, :]
 
-    def rebase_pass(self) -> BasePass:
-        return auto_rebase_pass(set(_TWO_QUBIT_GATES) | _1Q_GATES)
+        if self._result_type == "state_vector":
+            try:
+                phase = float(circuit.phase)
+                coeff = np.exp(phase * np.pi * 1j)
+                state *= coeff
+            except TypeError:
+                warning(
+                    "Global phase is dependent on a symbolic parameter, so cannot "
+                    "adjust for phase"
+                )
+        return state
 
-    def default_compilation_pass(self, optimisation_level: int = 1) -> BasePass:
-        assert optimisation_level in range(3)
-        if optimisation_level == 0:
-            return SequencePass(
-                [DecomposeBoxes(), FlattenRegisters(), self.rebase_pass()]
-            )
-        elif optimisation_level == 1:
-            return SequencePass(
+    def gradient(
+        self,
+        circuit: Circuit,
+        symbols: Sequence[Symbol],
+        bindings: Sequence[float],
+        operator: QubitPauliOperator,
+        method: str = "auto",
+    ) -> np.ndarray:
+        """
+        Calculate the gradient of the expectation value of an operator with
+        respect to the free symbols of a parametrised circuit.
+
+        :param circuit: Circuit to differentiate. It must satisfy the
+            requirements of the backend, except that it may contain symbols.
+        :param symbols: Symbols to differentiate with respect to.
+        :param bindings: Values of the symbols, in the same order as `symbols`,
+            at which the gradient is evaluated. Every free symbol of the
+            circuit must be bound.
+        :param operator: Hermitian operator whose expectation value is
+            differentiated.
+        :param method: Either "adjoint", which back-propagates through the
+            QuEST register in three sweeps of the circuit, "parameter_shift",
+            which simulates two shifted circuits per parametrised gate, or
+            "auto". Adjoint differentiation is only available for the
+            "state_vector" result type; "auto" uses it where available and
+            falls back to the parameter-shift rule otherwise.
+            Defaults to "auto".
+        :return: Array of the partial derivatives, in the same order as
+            `symbols`.
+        """
+        if len(symbols) != len(bindings):
+            raise ValueError("Each symbol must be given exactly one binding")
+        for pred in self.required_predicates:
+            if not isinstance(pred, NoSymbolsPredicate) and not pred.verify(circuit):
+                raise CircuitNotValidError(
+                    f"Circuit does not satisfy {pred} required by {type(self).__name__}"
+                )
+        circ = circuit.copy()
+        circ.replace_implicit_wire_swaps()
+        symbol_map = dict(zip(symbols, bindings))
+        unbound = circ.free_symbols() - set(symbols)
+        if unbound:
+            raise ValueError(f"Symbols {unbound} of the circuit are not bound")
+
+        commands = [
+            com
+            for com in circ.get_commands()
+            if com.op.type not in _MEASURE_GATES and com.op.type != OpType.Barrier
+        ]
+        # For each command: its QuEST qubit indices, its bound parameters, and
+        # the nonzero derivatives of its angle, keyed by symbol position
+        symbol_positions = {s: i for i, s in enumerate(symbols)}
+        indices: list[list[int]] = []
+        bound_params: list[list[float]] = []
+        angle_derivatives: list[dict[int, float]] = []
+        for com in commands:
+            indices.append([circ.n_qubits - 1 - q.index[0] for q in com.qubits])
+            params = [sympify(p) for p in com.op.params]
+            bound_params.append(
                 [
-                    DecomposeBoxes(),
-                    FlattenRegisters(),
-                    SynthesiseTket(),
-                    self.rebase_pass(),
+                    float(p.subs({s: symbol_map[s] for s in p.free_symbols}))
+                    for p in params
                 ]
             )
+            derivatives: dict[int, float] = {}
+            if com.op.type in _ROTATION_GENERATORS:
+                for s in params[0].free_symbols:
+                    derivative = params[0].diff(s)
+                    values = {t: symbol_map[t] for t in derivative.free_symbols}
+                    derivative_value = float(derivative.subs(values))
+                    if derivative_value != 0:
+                        derivatives[symbol_positions[s]] = derivative_value
+            angle_derivatives.append(derivatives)
+
+        qubits = sorted(circ.qubits, reverse=False)
+        observable = operator.to_sparse_matrix(qubits)
+
+        if method == "auto":
+            method = "parameter_shift" if self._density_matrix else "adjoint"
+        if method == "adjoint":
+            if self._density_matrix:
+                raise ValueError(
+                    "Adjoint differentiation requires the state_vector result type"
+                )
+            gradient_method = self._adjoint_gradient
+        elif method == "parameter_shift":
+            gradient_method = self._parameter_shift_gradient
         else:
-            return SequencePass(
-                [
-                    DecomposeBoxes(),
-                    FlattenRegisters(),
-                    FullPeepholeOptimise(),
-                    self.rebase_pass(),
-                ]
-            )
+            raise ValueError(f"Unsupported gradient method {method}")
+        return gradient_method(
+            circ.n_qubits,
+            [com.op.type for com in commands],
+            indices,
+            bound_params,
+            angle_derivatives,
+            observable,
+            len(symbols),
+        )
 
-    def process_circuits(
+    def _adjoint_gradient(
         self,
-        circuits: Sequence[Circuit],
-        n_shots: int | Sequence[int] | None = None,
-        valid_check: bool = True,
-        **kwargs: int | float | str | None,
-    ) -> list[ResultHandle]:
-        circuits = list(circuits)
+        n_qubits: int,
+        optypes: list[OpType],
+        indices: list[list[int]],
+        bound_params: list[list[float]],
+        angle_derivatives: list[dict[int, float]],
+        observable: csc_matrix,
+        n_symbols: int,
+    ) -> np.ndarray:
+        grad = np.zeros(n_symbols)
+        psi = self._sim(n_qubits, False)
+        for optype, idx, params in zip(optypes, indices, bound_params):
+            psi.apply_operator(_to_quest_gate(optype, idx, params))
+        lam = self._sim(n_qubits, False)
+        lam[:] = observable @ psi[:]
 
-        if valid_check:
-            self._check_all_circuits(circuits, nomeasure_warn=False)
+        for optype, idx, params, derivatives in zip(
+            reversed(optypes),
+            reversed(indices),
+            reversed(bound_params),
+            reversed(angle_derivatives),
+        ):
+            if derivatives:
+                # d<O>/da = 2 Re <lam| dU/da |psi_prev>, where
+                # dU/da |psi_prev> = -i * pi / 2 * P |psi>
+                generator = _to_quest_gate(_ROTATION_GENERATORS[optype], idx, [])
+                psi.apply_operator(generator)
+                # <lam|psi>, computed in QuEST without copying either state
+                overlap = lam.inner_product(psi)
+                psi.apply_operator(generator)
+                for position, derivative in derivatives.items():
+                    grad[position] += np.pi * overlap.imag * derivative
+            if optype in _ROTATION_GENERATORS:
+                inverse = _to_quest_gate(optype, idx, [-params[0]])
+            else:
+                inv_type, inv_params = _GATE_INVERSES[optype]
+                inverse = _to_quest_gate(inv_type, idx, inv_params)
+            psi.apply_operator(inverse)
+            lam.apply_operator(inverse)
+        return grad
 
-        handle_list = []
-        for circuit in circuits:
-            quest_state = self._sim(circuit.n_qubits, self._density_matrix)
-            quest_circ = tk_to_quest(
-                circuit, reverse_index=True, replace_implicit_swaps=True
+    def _parameter_shift_gradient(
+        self,
+        n_qubits: int,
+        optypes: list[OpType],
+        indices: list[list[int]],
+        bound_params: list[list[float]],
+        angle_derivatives: list[dict[int, float]],
+        observable: csc_matrix,
+        n_symbols: int,
+    ) -> np.ndarray:
+        grad = np.zeros(n_symbols)
+        quest_gates = [
+            _to_quest_gate(optype, idx, params)
+            for optype, idx, params in zip(optypes, indices, bound_params)
+        ]
+        for i, derivatives in enumerate(angle_derivatives):
+            if not derivatives:
+                continue
+            shifted_expectations = []
+            for shift in (0.5, -0.5):
+                shifted_gate = _to_quest_gate(
+                    optypes[i], indices[i], [bound_params[i][0] + shift]
+                )
+                quest_state = self._sim(n_qubits, self._density_matrix)
+                for j, quest_gate in enumerate(quest_gates):
+                    quest_state.apply_operator(shifted_gate if i == j else quest_gate)
+                if self._density_matrix:
+                    rho = quest_state[:, :]
+                    expectation = np.trace(observable @ rho).real
+                else:
+                    state = quest_state[:]
+                    expectation = np.vdot(state, observable @ state).real
+                shifted_expectations.append(expectation)
+                del quest_state
+            # Angles are in half-turns, hence the factor of pi
+            difference = shifted_expectations[0] - shifted_expectations[1]
+            for position, derivative in derivatives.items():
+                grad[position] += np.pi / 2 * difference * derivative
+        return grad
+
+    def sample_measurement_bases(
+        self,
+        circuit: Circuit,
+        bases: Union[np.ndarray, Sequence[Sequence[Pauli]]],
+        n_shots: int = 1,
+        seed: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Sample a circuit measured in many different single-qubit Pauli bases,
+        as required by randomised-measurement protocols such as classical
+        shadows.
+
+        The state prepared by the circuit is simulated once. For each
+        measurement setting the basis rotations are applied to a clone of that
+        state, which is then sampled.
+
+        :param circuit: Circuit preparing the state to measure.
+        :param bases: Array of shape (n_settings, n_qubits) giving the Pauli
+            basis to measure each qubit in, for each setting. Entries are
+            :py:class:`Pauli` values, or the corresponding integers; identity
+            entries are measured in the Z basis. Qubits are ordered as in
+            `sorted(circuit.qubits)`.
+        :param n_shots: Number of shots to sample per setting. Defaults to 1.
+        :param seed: Seed for the random number generator used in sampling.
+        :return: Array of outcomes with shape (n_settings, n_shots, n_qubits)
+            and dtype uint8, with qubits ordered as in `bases`.
+        """
+        self._check_all_circuits([circuit], nomeasure_warn=False)
+        n_qubits = circuit.n_qubits
+        basis_array = np.asarray(bases, dtype=int)
+        if basis_array.ndim != 2 or basis_array.shape[1] != n_qubits:
+            raise ValueError(
+                f"Measurement bases must have shape (n_settings, {n_qubits})"
             )
-            quest_state.apply_circuit(quest_circ)
+        rng = np.random.default_rng(seed)
 
-            if self._result_type == "state_vector":
-                state = quest_state[:]
-            else:
-                state = quest_state[:, :]
-            qubits = sorted(circuit.qubits, reverse=False)
-
-            if self._result_type == "state_vector":
-                try:
-                    phase = float(circuit.phase)
-                    coeff = np.exp(phase * np.pi * 1j)
-                    state *= coeff
-                except TypeError:
-                    warning(
-                        "Global phase is dependent on a symbolic parameter, so cannot "
-                        "adjust for phase"
-                    )
-            handle = ResultHandle(str(uuid4()))
-            if self._result_type == "state_vector":
-                self._cache[handle] = {
-                    "result": BackendResult(state=state, q_bits=qubits)
-                }
+        base_state = self._sim(n_qubits, self._density_matrix)
+        base_state.apply_circuit(
+            tk_to_quest(circuit, reverse_index=True, replace_implicit_swaps=True)
+        )
+        # Converted rotation gates for each (qubit, basis), shared by settings
+        rotations: dict[tuple[int, int], list[Any]] = {}
+        # Bit of each qubit, in ILO order, for every basis state index
+        shifts = np.arange(n_qubits - 1, -1, -1)
+        outcomes = np.empty((len(basis_array), n_shots, n_qubits), dtype=np.uint8)
+        for i, setting in enumerate(basis_array):
+            quest_state = base_state.copy()
+            for qubit, basis in enumerate(setting):
+                key = (qubit, int(basis))
+                if key not in rotations:
+                    rotations[key] = _basis_rotation(n_qubits, qubit, Pauli(basis))
+                for quest_gate in rotations[key]:
+                    quest_state.apply_operator(quest_gate)
+            if self._density_matrix:
+                # Only the diagonal is needed, so avoid reading the full matrix
+                probs = np.asarray(
+                    quest_state.prob_of_all_outcomes(list(range(n_qubits)))
+                )
             else:
-                self._cache[handle] = {
-                    "result": BackendResult(density_matrix=state, q_bits=qubits)
-                }
-
-            handle_list.append(handle)
+                probs = np.abs(quest_state[:]) ** 2
             del quest_state
-            del quest_circ
-        return handle_list
+            # Rounding errors can leave tiny negative probabilities
+            probs = np.clip(probs, 0, None)
+            samples = rng.choice(len(probs), size=n_shots, p=probs / probs.sum())
+            outcomes[i] = (samples[:, None] >> shifts) & 1
+        return outcomes
+
 
-    def circuit_status(self, handle: ResultHandle) -> CircuitStatus:
-        if handle in self._cache:
-            return CircuitStatus(StatusEnum.COMPLETED)
-        raise CircuitNotRunError(handle)
+def _basis_rotation(n_qubits: int, qubit: int, basis: Pauli) -> list[Any]:
+    """Convert the rotation measuring a qubit in a Pauli basis to QuEST gates."""
+    index = n_qubits - 1 - qubit
+    return [
+        _to_quest_gate(optype, [index], params)
+        for optype, params in _BASIS_ROTATIONS[basis]
+    ]
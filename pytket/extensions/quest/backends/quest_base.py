@@ -0,0 +1,167 @@
+# Copyright 2019-2024 Quantinuum
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Functionality shared by the QuEST backends, without importing pyquest
+"""
+
+from abc import abstractmethod
+from collections.abc import Sequence
+from typing import Optional
+from uuid import uuid4
+
+import numpy as np
+
+from pytket.backends import (
+    Backend,
+    CircuitNotRunError,
+    CircuitStatus,
+    ResultHandle,
+    StatusEnum,
+)
+from pytket.backends.backendinfo import BackendInfo
+from pytket.backends.backendresult import BackendResult
+from pytket.backends.resulthandle import _ResultIdTuple
+from pytket.circuit import Circuit, OpType
+from pytket.passes import (
+    BasePass,
+    DecomposeBoxes,
+    FlattenRegisters,
+    FullPeepholeOptimise,
+    SequencePass,
+    SynthesiseTket,
+    auto_rebase_pass,
+)
+from pytket.predicates import (
+    DefaultRegisterPredicate,
+    GateSetPredicate,
+    NoClassicalControlPredicate,
+    NoFastFeedforwardPredicate,
+    NoMidMeasurePredicate,
+    NoSymbolsPredicate,
+    Predicate,
+)
+
+
+class _QuESTBaseBackend(Backend):
+    """
+    Base class for backends returning QuEST state vectors or density matrices
+    """
+
+    _supports_shots = False
+    _supports_counts = False
+    _supports_state = True
+    _supports_unitary = False
+    _supports_density_matrix = True
+    _supports_expectation = False
+    _expectation_allows_nonhermitian = False
+    _supports_contextual_optimisation = False
+    _persistent_handles = False
+    _backend_info: BackendInfo
+
+    def __init__(self, result_type: str) -> None:
+        super().__init__()
+        self._result_type = result_type
+        if result_type == "state_vector":
+            self._density_matrix = False
+            self._supports_density_matrix = False
+        elif result_type == "density_matrix":
+            self._density_matrix = True
+            self._supports_state = False
+            self._supports_density_matrix = True
+        else:
+            raise ValueError(f"Unsupported result type {result_type}")
+
+    @property
+    def _result_id_type(self) -> _ResultIdTuple:
+        return (str,)
+
+    @property
+    def backend_info(self) -> Optional["BackendInfo"]:
+        return self._backend_info
+
+    @property
+    def required_predicates(self) -> list[Predicate]:
+        return [
+            NoClassicalControlPredicate(),
+            NoFastFeedforwardPredicate(),
+            NoMidMeasurePredicate(),
+            NoSymbolsPredicate(),
+            GateSetPredicate(self._backend_info.gate_set),
+            DefaultRegisterPredicate(),
+        ]
+
+    def rebase_pass(self) -> BasePass:
+        return auto_rebase_pass(self._backend_info.gate_set - {OpType.Barrier})
+
+    def default_compilation_pass(self, optimisation_level: int = 1) -> BasePass:
+        assert optimisation_level in range(3)
+        if optimisation_level == 0:
+            return SequencePass(
+                [DecomposeBoxes(), FlattenRegisters(), self.rebase_pass()]
+            )
+        elif optimisation_level == 1:
+            return SequencePass(
+                [
+                    DecomposeBoxes(),
+                    FlattenRegisters(),
+                    SynthesiseTket(),
+                    self.rebase_pass(),
+                ]
+            )
+        else:
+            return SequencePass(
+                [
+                    DecomposeBoxes(),
+                    FlattenRegisters(),
+                    FullPeepholeOptimise(),
+                    self.rebase_pass(),
+                ]
+            )
+
+    @abstractmethod
+    def _run_circuits(self, circuits: list[Circuit]) -> list[np.ndarray]:
+        """Return the state vector or density matrix prepared by each circuit."""
+        ...
+
+    def process_circuits(
+        self,
+        circuits: Sequence[Circuit],
+        n_shots: int | Sequence[int] | None = None,
+        valid_check: bool = True,
+        **kwargs: int | float | str | None,
+    ) -> list[ResultHandle]:
+        circuits = list(circuits)
+
+        if valid_check:
+            self._check_all_circuits(circuits, nomeasure_warn=False)
+
+        handle_list = []
+        for circuit, state in zip(circuits, self._run_circuits(circuits)):
+            qubits = sorted(circuit.qubits, reverse=False)
+            handle = ResultHandle(str(uuid4()))
+            if self._result_type == "state_vector":
+                self._cache[handle] = {
+                    "result": BackendResult(state=state, q_bits=qubits)
+                }
+            else:
+                self._cache[handle] = {
+                    "result": BackendResult(density_matrix=state, q_bits=qubits)
+                }
+            handle_list.append(handle)
+        return handle_list
+
+    def circuit_status(self, handle: ResultHandle) -> CircuitStatus:
+        if handle in self._cache:
+            return CircuitStatus(StatusEnum.COMPLETED)
+        raise CircuitNotRunError(handle)
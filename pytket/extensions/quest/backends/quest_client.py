@@ -0,0 +1,147 @@
+# Copyright 2019-2024 Quantinuum
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Client backend for running tket circuits on a QuEST simulation server
+"""
+
+import json
+import socket
+import struct
+from collections.abc import Sequence
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional
+
+import numpy as np
+
+from pytket.backends.backendinfo import BackendInfo
+from pytket.circuit import Circuit
+from pytket.extensions.quest.backends.quest_base import _QuESTBaseBackend
+
+# Messages are JSON documents prefixed with their length as an 8-byte integer
+_HEADER = struct.Struct("!Q")
+
+
+def _send_message(sock: socket.socket, message: dict[str, Any]) -> None:
+    data = json.dumps(message).encode()
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exactly(sock: socket.socket, n_bytes: int) -> Optional[bytes]:
+    chunks = []
+    while n_bytes > 0:
+        chunk = sock.recv(min(n_bytes, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n_bytes -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_message(sock: socket.socket) -> Optional[dict[str, Any]]:
+    """Receive a message, or None if the connection was closed."""
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    data = _recv_exactly(sock, _HEADER.unpack(header)[0])
+    if data is None:
+        return None
+    message: dict[str, Any] = json.loads(data)
+    return message
+
+
+def _read_shared_array(name: str, shape: Sequence[int], dtype: str) -> np.ndarray:
+    """Copy an array out of a shared memory block."""
+    shm = SharedMemory(name=name)
+    try:
+        array: np.ndarray = np.ndarray(
+            tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf
+        ).copy()
+    finally:
+        shm.close()
+    return array
+
+
+def _unlink_shared_arrays(results: Sequence[dict[str, Any]]) -> None:
+    """Release the shared memory blocks of a response, if they still exist."""
+    for result in results:
+        try:
+            shm = SharedMemory(name=result["name"])
+        except FileNotFoundError:
+            continue
+        shm.close()
+        shm.unlink()
+
+
+class QuESTClientBackend(_QuESTBaseBackend):
+    """
+    Backend for running simulations on a QuEST simulation server.
+
+    The server keeps the QuEST environment and registers alive between
+    jobs, so short-lived processes avoid the start-up cost of QuEST. Start
+    one with ``python -m pytket.extensions.quest.backends.quest_server
+    <socket_path>``.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        result_type: str = "state_vector",
+        precision: Optional[str] = None,
+    ) -> None:
+        """
+        Backend for running simulations on a QuEST simulation server
+
+        :param socket_path: Path of the Unix socket the server listens on.
+        :param result_type: Indicating the type of the simulation result
+            to be returned. It can be either "state_vector" or "density_matrix".
+            Defaults to "state_vector"
+        :param precision: Floating-point precision of the simulation, which
+            must match the server's QuEST build. See :py:class:`QuESTBackend`.
+            Defaults to the build precision
+        """
+        super().__init__(result_type)
+        self._socket_path = socket_path
+        self._precision = precision
+        response = self._request({"command": "info"})
+        self._backend_info = BackendInfo.from_dict(response["backend_info"])
+
+    def _request(self, message: dict[str, Any]) -> dict[str, Any]:
+        message = {
+            "result_type": self._result_type,
+            "precision": self._precision,
+            **message,
+        }
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self._socket_path)
+            _send_message(sock, message)
+            response = _recv_message(sock)
+        if response is None:
+            raise ConnectionError("QuEST server closed the connection")
+        if "error" in response:
+            raise RuntimeError(f"QuEST server error: {response['error']}")
+        return response
+
+    def _run_circuits(self, circuits: list[Circuit]) -> list[np.ndarray]:
+        response = self._request(
+            {"command": "process", "circuits": [c.to_dict() for c in circuits]}
+        )
+        # The server hands ownership of the blocks over, so release all of them
+        # even if reading one fails
+        try:
+            return [
+                _read_shared_array(r["name"], r["shape"], r["dtype"])
+                for r in response["results"]
+            ]
+        finally:
+            _unlink_shared_arrays(response["results"])
@@ -0,0 +1,155 @@
+# Copyright 2019-2024 Quantinuum
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Long-running QuEST simulation server for use with the QuESTClientBackend
+"""
+
+import argparse
+import os
+import socketserver
+import sys
+from logging import warning
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional
+
+import numpy as np
+from pyquest import Register
+from pyquest.initialisations import ClassicalState
+
+from pytket.circuit import Circuit
+from pytket.extensions.quest.backends.quest_backend import QuESTBackend
+from pytket.extensions.quest.backends.quest_client import (
+    _recv_message,
+    _send_message,
+    _unlink_shared_arrays,
+)
+
+
+def _write_shared_array(array: np.ndarray) -> dict[str, Any]:
+    """Copy an array into a new shared memory block, owned by the reader."""
+    # The client unlinks the block once it has read it, so the server's
+    # resource tracker must not unlink it (or warn about it) on exit
+    if sys.version_info >= (3, 13):
+        # pylint: disable-next=unexpected-keyword-arg
+        shm = SharedMemory(create=True, size=max(array.nbytes, 1), track=False)
+    else:
+        shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+    shm.close()
+    return {"name": shm.name, "shape": list(array.shape), "dtype": str(array.dtype)}
+
+
+class _QuESTRequestHandler(socketserver.StreamRequestHandler):
+    server: "QuESTServer"
+
+    def handle(self) -> None:
+        while True:
+            request = _recv_message(self.connection)
+            if request is None:
+                return
+            try:
+                response = self.server.handle_command(request)
+            except Exception as e:  # pylint: disable=broad-except
+                warning(f"QuEST server failed to handle request: {e}")
+                response = {"error": str(e)}
+            try:
+                _send_message(self.connection, response)
+            except OSError as e:
+                # The client has gone away and will never release the blocks
+                _unlink_shared_arrays(response.get("results", []))
+                warning(f"QuEST server failed to send response: {e}")
+                return
+
+
+class QuESTServer(socketserver.UnixStreamServer):
+    """
+    Server running circuits sent by :py:class:`QuESTClientBackend` instances.
+
+    The QuEST environment, one :py:class:`QuESTBackend` per result type and
+    precision, and one register per size and result type are kept alive for
+    the lifetime of the server. Requests are handled one at a time.
+    """
+
+    def __init__(self, socket_path: str) -> None:
+        """
+        Server running circuits sent by QuESTClientBackend instances
+
+        :param socket_path: Path of the Unix socket to listen on.
+        """
+        super().__init__(socket_path, _QuESTRequestHandler)
+        self._socket_path = socket_path
+        self._backends: dict[tuple[str, Optional[str]], QuESTBackend] = {}
+        self._registers: dict[tuple[int, bool], Register] = {}
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+
+    def _get_backend(self, result_type: str, precision: Optional[str]) -> QuESTBackend:
+        key = (result_type, precision)
+        if key not in self._backends:
+            self._backends[key] = QuESTBackend(
+                result_type=result_type, precision=precision
+            )
+        return self._backends[key]
+
+    def _get_register(self, n_qubits: int, density_matrix: bool) -> Register:
+        """Return a pooled register, reset to the zero state."""
+        key = (n_qubits, density_matrix)
+        if key not in self._registers:
+            self._registers[key] = Register(n_qubits, density_matrix)
+        else:
+            self._registers[key].apply_operator(ClassicalState(state_ind=0))
+        return self._registers[key]
+
+    def handle_command(self, request: dict[str, Any]) -> dict[str, Any]:
+        backend = self._get_backend(request["result_type"], request["precision"])
+        command = request["command"]
+        if command == "info":
+            assert backend.backend_info is not None
+            return {"backend_info": backend.backend_info.to_dict()}
+        elif command == "process":
+            results: list[dict[str, Any]] = []
+            try:
+                for circuit_dict in request["circuits"]:
+                    circuit = Circuit.from_dict(circuit_dict)
+                    quest_state = self._get_register(
+                        circuit.n_qubits, backend._density_matrix
+                    )
+                    state = backend._simulate(circuit, quest_state)
+                    results.append(_write_shared_array(state))
+            except Exception:
+                # The client never sees these blocks, so release them here
+                _unlink_shared_arrays(results)
+                raise
+            return {"results": results}
+        else:
+            raise ValueError(f"Unsupported command {command}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run a QuEST simulation server for QuESTClientBackend."
+    )
+    parser.add_argument("socket_path", help="Path of the Unix socket to listen on.")
+    args = parser.parse_args()
+    with QuESTServer(args.socket_path) as server:
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,9 @@
 
 """Conversion from tket circuits to QuEST circuits
 """
+from collections.abc import Sequence
+from typing import Any
+
 import numpy as np
 import pyquest.unitaries as gates
 from pyquest import Circuit as PyQuESTCircuit
@@ -38,6 +41,24 @@ _MEASURE_GATES = {OpType.Measure: Measurement}
 _TWO_QUBIT_GATES = {OpType.CX: gates.X, OpType.CZ: gates.Z, OpType.SWAP: gates.Swap}
 
 
+def _to_quest_gate(
+    optype: OpType, indices: Sequence[int], params: Sequence[float]
+) -> Any:
+    """Convert a gate acting on QuEST qubit indices, with angles in half-turns."""
+    if optype in _ONE_QUBIT_GATES:
+        return _ONE_QUBIT_GATES[optype](indices[0])
+    elif optype in _ONE_QUBIT_ROTATIONS:
+        return _ONE_QUBIT_ROTATIONS[optype](indices[0], params[0] * np.pi)
+    elif optype == OpType.SWAP:
+        return gates.Swap(targets=[indices[0], indices[1]])
+    elif optype == OpType.CZ:
+        return gates.Z(indices[1], controls=indices[0])
+    elif optype in _TWO_QUBIT_GATES:
+        return _TWO_QUBIT_GATES[optype](indices[1], controls=indices[0])
+    else:
+        raise NotImplementedError(f"Gate: {optype} Not Implemented in QuEST!")
+
+
 def tk_to_quest(
     circuit: Circuit, reverse_index: bool = True, replace_implicit_swaps: bool = False
 ) -> PyQuESTCircuit:
@@ -56,36 +77,10 @@ def tk_to_quest(
     }
     for com in circ:
         optype = com.op.type
-        if optype in _ONE_QUBIT_GATES:
-            quest_gate = _ONE_QUBIT_GATES[optype]
-            index = index_map[com.qubits[0].index[0]]
-            add_gate = quest_gate(index)
-            quest_operators.append(add_gate)
-
-        elif optype in _ONE_QUBIT_ROTATIONS:
-            quest_gate = _ONE_QUBIT_ROTATIONS[optype]
-            index = index_map[com.qubits[0].index[0]]
-            param = com.op.params[0] * np.pi
-            add_gate = quest_gate(index, param)
-            quest_operators.append(add_gate)
-
-        elif optype in _TWO_QUBIT_GATES:
-            id1 = index_map[com.qubits[0].index[0]]
-            id2 = index_map[com.qubits[1].index[0]]
-            quest_gate = _TWO_QUBIT_GATES[optype]
-            if optype == OpType.SWAP:
-                add_gate = quest_gate(targets=[id1, id2])
-            elif optype == OpType.CZ:
-                add_gate = gates.Z(id2, controls=id1)
-            else:
-                add_gate = quest_gate(id2, controls=id1)
-            quest_operators.append(add_gate)
-
-        elif optype in _MEASURE_GATES or optype == OpType.Barrier:
+        if optype in _MEASURE_GATES or optype == OpType.Barrier:
             continue
-
-        else:
-            raise NotImplementedError(f"Gate: {optype} Not Implemented in QuEST!")
+        indices = [index_map[q.index[0]] for q in com.qubits]
+        quest_operators.append(_to_quest_gate(optype, indices, com.op.params))
 
     quest_circ = PyQuESTCircuit(quest_operators)
     return quest_circ
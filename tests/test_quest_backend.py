@@ -15,10 +15,15 @@
 import math
 
 import numpy as np
+import pyquest
+import pytest
+from sympy import Symbol
 
-from pytket.circuit import BasisOrder, Circuit, OpType
+from pytket.circuit import BasisOrder, Circuit, OpType, Qubit
 from pytket.extensions.quest import QuESTBackend
 from pytket.passes import CliffordSimp
+from pytket.pauli import Pauli, QubitPauliString
+from pytket.utils.operators import QubitPauliOperator
 
 PARAM = -0.11176849
 backends = [
@@ -167,3 +172,106 @@ def test_default_pass() -> None:
 def test_backend_info() -> None:
     for b in backends:
         assert b.backend_info is not None
+
+
+def test_gradient() -> None:
+    a, b = Symbol("a"), Symbol("b")
+    circ = Circuit(2)
+    circ.Rx(a, 0).Ry(0.3, 1).CX(0, 1).Rz(2 * a + b, 1).H(0).Ry(b, 0)
+    zz = QubitPauliOperator(
+        {
+            QubitPauliString({Qubit(0): Pauli.Z, Qubit(1): Pauli.Z}): 0.7,
+            QubitPauliString({Qubit(0): Pauli.X}): -0.2,
+        }
+    )
+    bindings = [0.37, -0.81]
+    sv_backend = QuESTBackend()
+    dm_backend = QuESTBackend(result_type="density_matrix")
+
+    def expectation(values: list[float]) -> float:
+        bound = circ.copy()
+        bound.symbol_substitution({a: values[0], b: values[1]})
+        state = sv_backend.run_circuit(bound).get_state()
+        return zz.state_expectation(state, [Qubit(0), Qubit(1)]).real
+
+    eps = 1e-6
+    finite_diff = np.array(
+        [
+            (
+                expectation([bindings[0] + eps, bindings[1]])
+                - expectation([bindings[0] - eps, bindings[1]])
+            )
+            / (2 * eps),
+            (
+                expectation([bindings[0], bindings[1] + eps])
+                - expectation([bindings[0], bindings[1] - eps])
+            )
+            / (2 * eps),
+        ]
+    )
+    adjoint = sv_backend.gradient(circ, [a, b], bindings, zz, method="adjoint")
+    assert np.allclose(adjoint, finite_diff, atol=1e-5)
+    for backend in (sv_backend, dm_backend):
+        shift = backend.gradient(circ, [a, b], bindings, zz, method="parameter_shift")
+        assert np.allclose(shift, finite_diff, atol=1e-5)
+        # Adjoint for state vectors, parameter shift for density matrices
+        auto = backend.gradient(circ, [a, b], bindings, zz)
+        assert np.allclose(auto, finite_diff, atol=1e-5)
+    with pytest.raises(ValueError):
+        dm_backend.gradient(circ, [a, b], bindings, zz, method="adjoint")
+    with pytest.raises(ValueError):
+        sv_backend.gradient(circ, [a], bindings[:1], zz)
+
+
+def test_precision() -> None:
+    build_precision = {1: "single", 2: "double", 4: "quad"}[pyquest.env.precision]
+    dtype = {"single": np.complex64, "double": np.complex128}.get(build_precision)
+    circ = Circuit(2).H(0).CX(0, 1)
+    for result_type in ("state_vector", "density_matrix"):
+        for precision in (None, build_precision):
+            b = QuESTBackend(result_type=result_type, precision=precision)
+            assert b.backend_info is not None
+            assert b.backend_info.misc["precision"] == build_precision
+            res = b.run_circuit(b.get_compiled_circuit(circ))
+            if result_type == "state_vector":
+                state = res.get_state()
+                assert dtype is None or state.dtype == dtype
+                assert np.allclose(state, [math.sqrt(0.5), 0, 0, math.sqrt(0.5)])
+            else:
+                assert dtype is None or res.get_density_matrix().dtype == dtype
+    for precision in ("single", "double", "half"):
+        if precision != build_precision:
+            with pytest.raises(ValueError):
+                QuESTBackend(precision=precision)
+
+
+def test_sample_measurement_bases() -> None:
+    circ = Circuit(2).H(0).CX(0, 1)
+    bases = [
+        [Pauli.Z, Pauli.Z],
+        [Pauli.X, Pauli.X],
+        [Pauli.Y, Pauli.Y],
+        [Pauli.I, Pauli.Z],
+    ]
+    for b in backends:
+        outcomes = b.sample_measurement_bases(
+            b.get_compiled_circuit(circ), bases, n_shots=50, seed=1
+        )
+        assert outcomes.shape == (4, 50, 2)
+        assert outcomes.dtype == np.uint8
+        # Bell state: correlated in Z and X, anti-correlated in Y
+        assert np.all(outcomes[0, :, 0] == outcomes[0, :, 1])
+        assert np.all(outcomes[1, :, 0] == outcomes[1, :, 1])
+        assert np.all(outcomes[2, :, 0] != outcomes[2, :, 1])
+        assert np.all(outcomes[3, :, 0] == outcomes[3, :, 1])
+        with pytest.raises(ValueError):
+            b.sample_measurement_bases(circ, [[Pauli.Z]])
+        # Deterministic and asymmetric across qubits, to pin the qubit order
+        for asym, setting, expected in (
+            (Circuit(2).X(0).H(1), [Pauli.Z, Pauli.X], [1, 0]),
+            (Circuit(2).H(0).X(1), [Pauli.X, Pauli.Z], [0, 1]),
+        ):
+            outcomes = b.sample_measurement_bases(
+                b.get_compiled_circuit(asym), [setting], n_shots=20, seed=2
+            )
+            assert np.all(outcomes[0] == expected)
@@ -0,0 +1,73 @@
+# Copyright 2020-2024 Quantinuum
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pytket.circuit import Circuit
+from pytket.extensions.quest import QuESTBackend
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not available"
+)
+
+
+def test_client_does_not_import_pyquest() -> None:
+    code = (
+        "import sys\n"
+        "from pytket.extensions.quest import QuESTClientBackend\n"
+        "from pytket.extensions.quest.backends import QuESTClientBackend\n"
+        "assert 'pyquest' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_client_backend(tmp_path: Path) -> None:
+    from pytket.extensions.quest import QuESTClientBackend, QuESTServer
+
+    socket_path = str(tmp_path / "quest.sock")
+    with QuESTServer(socket_path) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            circ = Circuit(3).H(0).CX(0, 1).Rz(0.3, 1).CX(1, 2).Ry(-0.7, 2)
+            for result_type in ("state_vector", "density_matrix"):
+                local = QuESTBackend(result_type=result_type)
+                client = QuESTClientBackend(socket_path, result_type=result_type)
+                assert client.backend_info is not None
+                assert local.backend_info is not None
+                assert client.backend_info.gate_set == local.backend_info.gate_set
+                compiled = client.get_compiled_circuit(circ)
+                expected = local.run_circuit(compiled)
+                for _ in range(2):
+                    # The second run reuses the server's pooled registers
+                    handles = client.process_circuits([compiled, compiled])
+                    for handle in handles:
+                        res = client.get_result(handle)
+                        if result_type == "state_vector":
+                            assert np.allclose(res.get_state(), expected.get_state())
+                        else:
+                            assert np.allclose(
+                                res.get_density_matrix(),
+                                expected.get_density_matrix(),
+                            )
+        finally:
+            server.shutdown()
+            thread.join()